@@ -12,6 +12,7 @@
 Throughput test: 6m 25s @ 1M rows / 150 keys / 1.5GB
 NOTE: This is naive and will vary drastically based on network speed, for example on a GCP VM.
 """
+import mmap
 import os
 from io import BytesIO
 from multiprocessing import Process
@@ -19,7 +20,6 @@ from multiprocessing.dummy import Process as _Thread
 from queue import Empty
 from typing import Any, Dict, NamedTuple, Optional, Type, Union
 
-import orjson
 from google.cloud import bigquery
 
 from target_bigquery.core import (
@@ -35,7 +35,7 @@ from target_bigquery.core import (
 class Job:
     def __init__(
         self,
-        data: Union[memoryview, bytes],
+        data: Union[memoryview, mmap.mmap, bytes],
         table: str,
         config: Dict[str, Any],
     ) -> None:
@@ -60,8 +60,10 @@ class BatchJobWorker(BaseWorker):
                 break
             try:
                 client.load_table_from_file(
-                    BytesIO(job.data),
+                    # An mmap is already a readable binary file, only wrap raw buffers
+                    job.data if isinstance(job.data, mmap.mmap) else BytesIO(job.data),
                     job.table,
+                    rewind=True,
                     num_retries=3,
                     job_config=bigquery.LoadJobConfig(**job.config),
                 ).result()
@@ -116,7 +118,7 @@ class BigQueryBatchJobSink(BaseBigQuerySink):
         return Worker
 
     def process_record(self, record: Dict[str, Any], context: Dict[str, Any]) -> None:
-        self.buffer.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+        self.buffer.write_record(record)
 
     def process_batch(self, context: Dict[str, Any]) -> None:
         self.buffer.close()
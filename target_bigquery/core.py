@@ -39,6 +39,7 @@ from tempfile import TemporaryFile
 from textwrap import dedent, indent
 from typing import IO, TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Tuple, Type, Union
 
+import orjson
 from google.api_core.exceptions import Conflict, Forbidden
 from google.cloud import bigquery, bigquery_storage_v1, storage
 from google.cloud.bigquery import SchemaField
@@ -46,7 +47,7 @@ from google.cloud.bigquery.table import TimePartitioning, TimePartitioningType
 from singer_sdk.sinks import BatchSink
 from tenacity import retry, retry_if_exception_type, stop_after_attempt, wait_fixed
 
-from target_bigquery.constants import DEFAULT_SCHEMA
+from target_bigquery.constants import DEFAULT_SCHEMA, SDC_FIELDS
 
 if TYPE_CHECKING:
     from target_bigquery.target import TargetBigQuery
@@ -100,10 +101,8 @@ class BigQueryTable:
     def schema_translator(self) -> "SchemaTranslator":
         """Returns a SchemaTranslator instance for this table."""
         if not hasattr(self, "_schema_translator"):
-            self._schema_translator = SchemaTranslator(
-                schema=self.jsonschema,
-                transforms=self.transforms,
-                resolver_version=self.schema_resolver_version,
+            self._schema_translator = schema_translator_factory(
+                self.jsonschema, self.transforms, self.schema_resolver_version
             )
         return self._schema_translator
 
@@ -276,6 +275,8 @@ class BaseBigQuerySink(BatchSink):
 
     include_sdc_metadata_properties: bool = True
     ingestion_strategy = IngestionStrategy.FIXED
+    serialize_data: bool = False
+    """Whether the fixed schema `data` column is serialized to a JSON string on preprocess."""
 
     def __init__(
         self,
@@ -356,6 +357,7 @@ class BaseBigQuerySink(BatchSink):
         self.global_par_typ = target.par_typ
         self.global_queue = target.queue
         self.increment_jobs_enqueued = target.increment_jobs_enqueued
+        self.wait_for_capacity = target.wait_for_capacity
 
     def _is_upsert_candidate(self) -> bool:
         """Determine if this stream is an upsert candidate based on user configuration."""
@@ -434,17 +436,10 @@ class BaseBigQuerySink(BatchSink):
 
     def preprocess_record(self, record: Dict[str, Any], context: Dict[str, Any]) -> Dict[str, Any]:
         """Preprocess a record before writing it to the sink."""
-        metadata = {
-            k: record.pop(k, None)
-            for k in (
-                "_sdc_extracted_at",
-                "_sdc_received_at",
-                "_sdc_batched_at",
-                "_sdc_deleted_at",
-                "_sdc_sequence",
-                "_sdc_table_version",
-            )
-        }
+        pop = record.pop
+        metadata = {k: pop(k, None) for k in SDC_FIELDS}
+        if self.serialize_data:
+            return {"data": orjson.dumps(record).decode("utf-8"), **metadata}
         return {"data": record, **metadata}
 
     @retry(
@@ -558,6 +553,13 @@ class Denormalized:
 
     ingestion_strategy = IngestionStrategy.DENORMALIZED
 
+    def __init__(self: BaseBigQuerySink, *args, **kwargs) -> None:
+        """Initialize the sink, specializing record preprocessing for the configured transforms."""
+        super().__init__(*args, **kwargs)
+        if not self.table.schema_translator.transforms:
+            # Records pass through unchanged so skip the per record method call entirely
+            self.preprocess_record = lambda record, context: record
+
     @retry(
         retry=retry_if_exception_type(ConnectionError),
         stop=stop_after_attempt(3),
@@ -637,6 +639,36 @@ def storage_client_factory(
     return bigquery_storage_v1.BigQueryWriteClient()
 
 
+_SCHEMA_TRANSLATORS: Dict[
+    Tuple[bytes, Tuple[Any, ...], SchemaResolverVersion], "SchemaTranslator"
+] = {}
+"""SchemaTranslators keyed by serialized schema, transforms, and resolver version."""
+
+
+def schema_translator_factory(
+    schema: Dict[str, Any],
+    transforms: Dict[str, bool],
+    resolver_version: SchemaResolverVersion = SchemaResolverVersion.V1,
+) -> "SchemaTranslator":
+    """Get a SchemaTranslator, shared by all tables with the same schema and options.
+
+    The serialized schema is only used as the cache key. The translator is built from the
+    schema as given so the tap's property order is preserved. Decimals, which the SDK uses
+    to parse floats in SCHEMA messages, are serialized as strings for the key."""
+    key = (
+        orjson.dumps(schema, default=str),
+        tuple(sorted(transforms.items())),
+        resolver_version,
+    )
+    if key not in _SCHEMA_TRANSLATORS:
+        _SCHEMA_TRANSLATORS[key] = SchemaTranslator(
+            schema=schema,
+            transforms=transforms,
+            resolver_version=resolver_version,
+        )
+    return _SCHEMA_TRANSLATORS[key]
+
+
 @dataclass
 class _FieldProjection:
     projection: str
@@ -667,6 +699,11 @@ class SchemaTranslator:
         # Used by the denormalized strategy where we eagerly transform
         # the target schema
         self._translated_schema_transformed = None
+        # Record keys resolved to their transformed column names. Precompiled from the schema
+        # so the per record translation is a dict lookup, keys outside the schema are added lazily
+        self._record_key_map: Dict[str, str] = {}
+        if self.transforms:
+            self._compile_record_keys(self.schema)
 
     @property
     def translated_schema(self) -> List[SchemaField]:
@@ -690,23 +727,35 @@ class SchemaTranslator:
             ]
         return self._translated_schema_transformed
 
+    def _compile_record_keys(self, schema_property: dict) -> None:
+        """Resolve the transformed name of every property key nested in a JSON schema."""
+        for name, contents in schema_property.get("properties", {}).items():
+            self._translate_record_key(name)
+            if isinstance(contents, dict):
+                self._compile_record_keys(contents)
+                if isinstance(contents.get("items"), dict):
+                    self._compile_record_keys(contents["items"])
+
+    def _translate_record_key(self, key: str) -> str:
+        """Translate a record key using the SchemaTranslator `transforms` and memoize it."""
+        translated = transform_column_name(key, **{**self.transforms, "quote": False})
+        self._record_key_map[key] = translated
+        return translated
+
     def translate_record(self, record: dict) -> dict:
         """Translate a record using the SchemaTranslator `transforms`."""
         if not self.transforms:
             return record
-        output = dict(
-            [
-                (transform_column_name(k, **{**self.transforms, "quote": False}), v)
-                for k, v in record.items()
-            ]
-        )
-        for k, v in output.items():
-            if isinstance(v, list):
+        key_map = self._record_key_map
+        output = {}
+        for k, v in record.items():
+            if isinstance(v, dict):
+                v = self.translate_record(v)
+            elif isinstance(v, list):
                 for i, inner in enumerate(v):
                     if isinstance(inner, dict):
-                        output[k][i] = self.translate_record(inner)
-            if isinstance(v, dict):
-                output[k] = self.translate_record(v)
+                        v[i] = self.translate_record(inner)
+            output[key_map[k] if k in key_map else self._translate_record_key(k)] = v
         return output
 
     def generate_view_statement(self, table_name: BigQueryTable) -> str:
@@ -917,6 +966,10 @@ class SchemaTranslator:
         )
 
 
+MAX_ROWS_PER_WRITE = 1000
+"""Maximum number of records serialized into a single write to a Compressor."""
+
+
 class Compressor:
     """Compresses streams of bytes using gzip."""
 
@@ -924,6 +977,7 @@ class Compressor:
         """Initialize the compressor."""
         self._compressor = None
         self._closed = False
+        self._records: List[Dict[str, Any]] = []
         if shutil.which("gzip") is not None:
             self._buffer = TemporaryFile()
             self._compressor = Popen(["gzip", "-"], stdin=PIPE, stdout=self._buffer)
@@ -940,6 +994,18 @@ class Compressor:
             raise ValueError("I/O operation on closed compressor.")
         self._gzip.write(data)
 
+    def write_record(self, record: Dict[str, Any]) -> None:
+        """Buffer a record, writing buffered records to the compressor in bounded slices."""
+        self._records.append(record)
+        if len(self._records) >= MAX_ROWS_PER_WRITE:
+            self.write_records(self._records)
+            self._records = []
+
+    def write_records(self, records: List[Dict[str, Any]]) -> None:
+        """Serialize records as newline delimited JSON and write them to the compressor."""
+        dumps, option = orjson.dumps, orjson.OPT_APPEND_NEWLINE
+        self.write(b"".join([dumps(record, option=option) for record in records]))
+
     def flush(self) -> None:
         """Flush the compressor buffer."""
         self._gzip.flush()
@@ -949,6 +1015,9 @@ class Compressor:
         """Close the compressor and wait for the gzip process to finish."""
         if self._closed:
             return
+        if self._records:
+            self.write_records(self._records)
+            self._records = []
         self._gzip.close()
         if self._compressor is not None:
             self._compressor.wait()
@@ -994,9 +1063,19 @@ class Compressor:
         self._buffer = None
 
 
-# pylint: disable=no-else-return,too-many-branches,too-many-return-statements
 def bigquery_type(property_type: List[str], property_format: Optional[str] = None) -> str:
     """Convert a JSON Schema type to a BigQuery type."""
+    if not isinstance(property_type, str):
+        property_type = tuple(property_type)
+    return _bigquery_type(property_type, property_format)
+
+
+# pylint: disable=no-else-return,too-many-branches,too-many-return-statements
+@cache
+def _bigquery_type(
+    property_type: Union[str, Tuple[str, ...]], property_format: Optional[str] = None
+) -> str:
+    """Convert a hashable JSON Schema type to a BigQuery type."""
     if property_format == "date-time":
         return "timestamp"
     if property_format == "date":
@@ -1017,6 +1096,10 @@ def bigquery_type(property_type: List[str], property_format: Optional[str] = Non
         return "string"
 
 
+SNAKE_CASE_PATTERN = re.compile("((?!^)(?<!_)[A-Z][a-z]+|(?<=[a-z0-9])[A-Z])")
+"""Matches the word boundaries which are prefixed with an underscore when snake casing."""
+
+
 # Column name transforms are configurable and entirely opt-in.
 # This allows users to only use the transforms they need and not
 # become dependent on inconfigurable transforms outside their
@@ -1035,7 +1118,7 @@ def transform_column_name(
     was_quoted = name.startswith("`") and name.endswith("`")
     name = name.strip("`")
     if snake_case:
-        name = re.sub("((?!^)(?<!_)[A-Z][a-z]+|(?<=[a-z0-9])[A-Z])", r"_\1", name)
+        name = SNAKE_CASE_PATTERN.sub(r"_\1", name)
     if lower:
         name = "{}".format(name).lower()
     if add_underscore_when_invalid:
@@ -12,19 +12,26 @@
 Throughput test: 6m 30s @ 1M rows / 150 keys / 1.5GB
 NOTE: This is naive and will vary drastically based on network speed, for example on a GCP VM.
 """
+import logging
+import mmap
 import os
-import shutil
 import time
-from io import BytesIO
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+
+try:
+    from functools import cache
+except ImportError:
+    from functools import lru_cache as cache
+
 from multiprocessing import Process
 from multiprocessing.connection import Connection
 from multiprocessing.dummy import Process as _Thread
 from queue import Empty
-from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Type, Union
+from typing import TYPE_CHECKING, Any, Dict, List, NamedTuple, Optional, Set, Type, Union
 
-import orjson
-from google.api_core.exceptions import Conflict
+from google.api_core.exceptions import Conflict, NotFound
 from google.cloud import bigquery, storage
+from google.cloud.storage.retry import DEFAULT_RETRY
 
 from target_bigquery.constants import DEFAULT_BUCKET_PATH
 from target_bigquery.core import (
@@ -41,13 +48,78 @@ from target_bigquery.core import (
 if TYPE_CHECKING:
     from target_bigquery.target import TargetBigQuery
 
+logger = logging.getLogger(__name__)
+
+
+# Composite upload constants
+COMPOSITE_PART_SIZE = 1024 * 1024 * 8
+"""Minimum size of each part of a composite upload, smaller buffers are uploaded directly."""
+MAX_COMPOSITE_PARTS = 32
+"""Maximum number of source objects GCS accepts in a single compose request."""
+MAX_COMPOSITE_PARTS_IN_FLIGHT = 4
+"""Maximum number of parts of a single composite upload copied and uploading at once."""
+
+
+@cache
+def composite_upload_executor() -> ThreadPoolExecutor:
+    """Get the thread pool shared by all composite uploads in this process."""
+    return ThreadPoolExecutor(max_workers=MAX_COMPOSITE_PARTS, thread_name_prefix="gcs-part")
+
+
+def upload_composite(blob: storage.Blob, buffer: Union[memoryview, mmap.mmap, bytes]) -> None:
+    """Upload a buffer as parts in parallel and compose them server side into the blob.
+
+    Parts are plain byte ranges of the buffer so the composed object is byte for byte
+    identical to a direct upload. Parts are always deleted, even if the compose fails.
+    Failing to delete a part is logged rather than raised since the blob itself is intact."""
+    view = memoryview(buffer)
+    part_size = max(COMPOSITE_PART_SIZE, -(-len(view) // MAX_COMPOSITE_PARTS))
+    parts = [
+        (blob.bucket.blob(f"{blob.name}.part{i // part_size:02d}"), i)
+        for i in range(0, len(view), part_size)
+    ]
+    executor = composite_upload_executor()
+    in_flight: Set[Future] = set()
+    try:
+        # Parts are copied out of the buffer lazily so only a bounded number exist at once
+        for part, offset in parts:
+            if len(in_flight) >= MAX_COMPOSITE_PARTS_IN_FLIGHT:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    future.result()
+            in_flight.add(
+                executor.submit(
+                    part.upload_from_string,
+                    bytes(view[offset : offset + part_size]),
+                    content_type="application/octet-stream",
+                    timeout=300,
+                    # Parts are uniquely named temporary objects so retrying is always safe
+                    retry=DEFAULT_RETRY,
+                )
+            )
+        done, in_flight = wait(in_flight)
+        for future in done:
+            future.result()
+        blob.compose([part for part, _ in parts], if_generation_match=0, timeout=300)
+    finally:
+        # Let uploads still running after a failure finish so no part is created after cleanup
+        wait(in_flight)
+        for part, _ in parts:
+            try:
+                part.delete()
+            except NotFound:
+                pass
+            except Exception as exc:
+                logger.warning("Failed to delete composite upload part %s: %s", part.name, exc)
+        view.release()
+
 
 class Job:
     """Job to be processed by a worker."""
 
     def __init__(
         self,
-        buffer: Union[memoryview, bytes],
+        buffer: Union[memoryview, mmap.mmap, bytes],
         batch_id: str,
         table: str,
         dataset: str,
@@ -87,14 +159,17 @@ class GcsStagingWorker(BaseWorker):
                 )
                 blob = storage.Blob.from_string(path, client=client)
                 # TODO: pass in timeout?
-                # TODO: composite uploads
-                with blob.open(
-                    "wb",
-                    if_generation_match=0,
-                    chunk_size=1024 * 1024 * 10,
-                    timeout=300,
-                ) as fh:
-                    shutil.copyfileobj(BytesIO(job.buffer), fh)
+                if len(job.buffer) > COMPOSITE_PART_SIZE:
+                    upload_composite(blob, job.buffer)
+                else:
+                    # Buffers here fit within a single chunk so they are written in one go
+                    with blob.open(
+                        "wb",
+                        if_generation_match=0,
+                        chunk_size=1024 * 1024 * 10,
+                        timeout=300,
+                    ) as fh:
+                        fh.write(job.buffer)
                 job.gcs_notifier.send(path)
             except Exception as exc:
                 job.attempt += 1
@@ -163,7 +238,7 @@ class BigQueryGcsStagingSink(BaseBigQuerySink):
         }
 
     def process_record(self, record: Dict[str, Any], context: Dict[str, Any]) -> None:
-        self.buffer.write(orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE))
+        self.buffer.write_record(record)
 
     def process_batch(self, context: Dict[str, Any]) -> None:
         self.buffer.close()
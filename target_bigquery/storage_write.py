@@ -13,15 +13,16 @@ Throughput test: 11m 0s @ 1M rows / 150 keys / 1.5GB
 NOTE: This is naive and will vary drastically based on network speed, for example on a GCP VM.
 """
 import os
+from collections import deque
 from multiprocessing import Process
 from multiprocessing.connection import Connection
 from multiprocessing.dummy import Process as _Thread
 from queue import Empty
-from time import sleep
 from typing import (
     TYPE_CHECKING,
     Any,
     Callable,
+    Deque,
     Dict,
     List,
     NamedTuple,
@@ -33,7 +34,6 @@ from typing import (
     cast,
 )
 
-import orjson
 from google.cloud.bigquery_storage_v1 import BigQueryWriteClient, types, writer
 from google.protobuf import json_format
 from proto import Message
@@ -52,6 +52,8 @@ logger = logging.getLogger(__name__)
 # Stream specific constant
 MAX_IN_FLIGHT = 15
 """Maximum number of concurrent requests per worker be processed by grpc before awaiting."""
+MAX_REQUEST_BYTES = 1024 * 1024 * 9
+"""Maximum serialized size of a single append request, below the 10MB API limit."""
 
 Dispatcher = Callable[[types.AppendRowsRequest], writer.AppendRowsFuture]
 StreamComponents = Tuple[str, writer.AppendRowsStream, Dispatcher]
@@ -107,6 +109,11 @@ def generate_request(
     return request
 
 
+def framed_size(row: bytes) -> int:
+    """Size of a serialized row once framed in ProtoRows, including its tag and length prefix."""
+    return 1 + (max(len(row).bit_length(), 1) + 6) // 7 + len(row)
+
+
 def generate_template(message: Type[Message]):
     """Generate a template for the storage write API from a proto message class."""
     from google.protobuf import descriptor_pb2
@@ -151,7 +158,7 @@ class StorageWriteBatchWorker(BaseWorker):
         """Initialize the worker process."""
         super().__init__(*args, **kwargs)
         self.get_stream_components = get_application_stream
-        self.awaiting: List[writer.AppendRowsFuture] = []
+        self.awaiting: Deque[writer.AppendRowsFuture] = deque()
         self.cache: Dict[str, StreamComponents] = {}
         self.max_errors_before_recycle = 5
         self.offsets: Dict[str, int] = {}
@@ -233,7 +240,7 @@ class StorageWriteBatchWorker(BaseWorker):
         """Wait for in-flight requests to complete."""
         while self.awaiting and ((len(self.awaiting) > MAX_IN_FLIGHT // 2) or drain):
             try:
-                self.awaiting.pop(0).result()
+                self.awaiting.popleft().result()
             except Exception as exc:
                 self.error_notifier.send((exc, self.serialize_exception(exc)))
             finally:
@@ -267,6 +274,7 @@ class BigQueryStorageWriteSink(BaseBigQuerySink):
     MAX_JOBS_QUEUED = MAX_WORKERS * 2
     WORKER_CAPACITY_FACTOR = 10
     WORKER_CREATION_MIN_INTERVAL = 1.0
+    serialize_data = True
 
     @staticmethod
     def worker_cls_factory(
@@ -301,6 +309,8 @@ class BigQueryStorageWriteSink(BaseBigQuerySink):
         )
         self.stream_notification, self.stream_notifier = target.pipe_cls(False)
         self.template = generate_template(self.proto_schema)
+        # Every request carries the writer schema from the template on top of its rows
+        self.template_bytes = types.AppendRowsRequest.pb(self.template).ByteSize()
 
     @property
     def proto_schema(self) -> Type[Message]:
@@ -312,22 +322,24 @@ class BigQueryStorageWriteSink(BaseBigQuerySink):
 
     def start_batch(self, context: Dict[str, Any]) -> None:
         self.proto_rows = types.ProtoRows()
-
-    def preprocess_record(self, record: dict, context: dict) -> dict:
-        record = super().preprocess_record(record, context)
-        record["data"] = orjson.dumps(record["data"]).decode("utf-8")
-        return record
+        self.proto_rows_bytes = self.template_bytes
 
     def process_record(self, record: Dict[str, Any], context: Dict[str, Any]) -> None:
-        self.proto_rows.serialized_rows.append(
-            json_format.ParseDict(record, self.proto_schema()).SerializeToString()
-        )
+        row = json_format.ParseDict(record, self.proto_schema()).SerializeToString()
+        # Split the batch into multiple append requests rather than exceed the request size limit
+        row_bytes = framed_size(row)
+        if self.proto_rows.serialized_rows and (
+            self.proto_rows_bytes + row_bytes > MAX_REQUEST_BYTES
+        ):
+            self.process_batch(context)
+            self.start_batch(context)
+        self.proto_rows.serialized_rows.append(row)
+        self.proto_rows_bytes += row_bytes
 
     def process_batch(self, context: Dict[str, Any]) -> None:
-        while self.global_queue.qsize() >= self.MAX_JOBS_QUEUED:
-            self.logger.warn(f"Max jobs enqueued reached ({self.MAX_JOBS_QUEUED})")
-            sleep(1)
-
+        if self.global_queue.qsize() >= self.MAX_JOBS_QUEUED:
+            self.logger.warning(f"Max jobs enqueued reached ({self.MAX_JOBS_QUEUED})")
+            self.wait_for_capacity(self.MAX_JOBS_QUEUED)
         self.global_queue.put(
             Job(
                 parent=self.parent,
@@ -13,6 +13,7 @@ Throughput test: ...slower than all other methods, no test results available.
 NOTE: This is naive and will vary drastically based on network speed, for example on a GCP VM.
 """
 import os
+import uuid
 from multiprocessing import Process
 from multiprocessing.dummy import Process as _Thread
 from queue import Empty
@@ -20,11 +21,43 @@ from typing import Any, Dict, List, NamedTuple, Optional, Type, Union
 
 import orjson
 from google.api_core.exceptions import GatewayTimeout, NotFound
-from google.cloud import _http, bigquery
+from google.cloud import bigquery
 from tenacity import retry, retry_if_exception_type, stop_after_delay, wait_fixed
 
 from target_bigquery.core import BaseBigQuerySink, BaseWorker, Denormalized, bigquery_client_factory
 
+# Stream specific constant
+MAX_ROWS_PER_REQUEST = 500
+"""Default maximum number of rows sent in a single insertAll request, as recommended by BigQuery."""
+MAX_ROWS_PER_REQUEST_LIMIT = 50_000
+"""Hard limit on the number of rows BigQuery accepts in a single insertAll request."""
+
+
+def insert_rows(
+    client: bigquery.Client,
+    table: bigquery.TableReference,
+    rows: List[Dict[str, Any]],
+    timeout: Optional[float] = None,
+) -> List[Dict[str, Any]]:
+    """Insert rows via the insertAll API, serializing the request body with orjson.
+
+    This mirrors `bigquery.Client.insert_rows_json` including generated insert ids and the
+    default retry on rate limits and backend errors, but sends a pre-serialized payload
+    rather than relying on the stdlib json encoder."""
+    payload = orjson.dumps({"rows": [{"insertId": str(uuid.uuid4()), "json": row} for row in rows]})
+    path = f"{table.path}/insertAll"
+    response = client._call_api(
+        bigquery.DEFAULT_RETRY,
+        span_name="BigQuery.insertRowsJson",
+        span_attributes={"path": path},
+        method="POST",
+        path=path,
+        data=payload,
+        content_type="application/json",
+        timeout=timeout,
+    )
+    return response.get("insertErrors", [])
+
 
 class Job:
     """Job to be processed by a worker."""
@@ -44,8 +77,6 @@ class StreamingInsertWorker(BaseWorker):
 
     def run(self) -> None:
         """Run the worker."""
-        # A monkey patch since we can't override the default json encoder...
-        _http.json = orjson
         client: bigquery.Client = bigquery_client_factory(self.credentials)
         while True:
             try:
@@ -56,14 +87,14 @@ class StreamingInsertWorker(BaseWorker):
                 break
             try:
                 _ = retry(
-                    client.insert_rows_json,
+                    insert_rows,
                     retry=retry_if_exception_type(
                         (ConnectionError, TimeoutError, NotFound, GatewayTimeout)
                     ),
                     wait=wait_fixed(1),
                     stop=stop_after_delay(10),
                     reraise=True,
-                )(table=job.table, json_rows=job.records)
+                )(client, table=job.table, rows=job.records)
             except Exception as exc:
                 job.attempt += 1
                 if job.attempt > 3:
@@ -93,6 +124,7 @@ class BigQueryStreamingInsertSink(BaseBigQuerySink):
     MAX_WORKERS = os.cpu_count() * 2
     WORKER_CAPACITY_FACTOR = 10
     WORKER_CREATION_MIN_INTERVAL = 1.0
+    serialize_data = True
 
     @staticmethod
     def worker_cls_factory(
@@ -101,22 +133,38 @@ class BigQueryStreamingInsertSink(BaseBigQuerySink):
         Worker = type("Worker", (StreamingInsertWorker, worker_executor_cls), {})
         return Worker
 
-    def preprocess_record(self, record: dict, context: dict) -> dict:
-        record = super().preprocess_record(record, context)
-        record["data"] = orjson.dumps(record["data"]).decode("utf-8")
-        return record
+    def __init__(self, *args, **kwargs) -> None:
+        super().__init__(*args, **kwargs)
+        # Validate the configured chunk size up front rather than on the first batch
+        self.rows_per_request
 
     @property
-    def max_size(self) -> int:
-        return min(super().max_size, 500)
+    def rows_per_request(self) -> int:
+        """Maximum number of rows sent in a single insertAll request."""
+        chunk_size = self.config.get("options", {}).get(
+            "streaming_insert_chunk_size", MAX_ROWS_PER_REQUEST
+        )
+        if chunk_size < 1:
+            raise ValueError(
+                f"options.streaming_insert_chunk_size must be at least 1, got {chunk_size}"
+            )
+        return min(chunk_size, MAX_ROWS_PER_REQUEST_LIMIT)
 
     def process_record(self, record: Dict[str, Any], context: Dict[str, Any]) -> None:
         self.records_to_drain.append(record)
 
     def process_batch(self, context: Dict[str, Any]) -> None:
-        self.global_queue.put(Job(table=self.table.as_ref(), records=self.records_to_drain.copy()))
-        self.increment_jobs_enqueued()
-        self.records_to_drain = []
+        # Hand the drained list off to the job(s) rather than copying it
+        table, chunk_size = self.table.as_ref(), self.rows_per_request
+        records, self.records_to_drain = self.records_to_drain, []
+        if len(records) <= chunk_size:
+            self.global_queue.put(Job(table=table, records=records))
+            self.increment_jobs_enqueued()
+            return
+        # Split the batch into request sized jobs so workers can insert them concurrently
+        for i in range(0, len(records), chunk_size):
+            self.global_queue.put(Job(table=table, records=records[i : i + chunk_size]))
+            self.increment_jobs_enqueued()
 
 
 class BigQueryStreamingInsertDenormalizedSink(Denormalized, BigQueryStreamingInsertSink):
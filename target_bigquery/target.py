@@ -227,6 +227,17 @@ class TargetBigQuery(Target):
                         " to true, we will use a process pool."
                     ),
                 ),
+                th.Property(
+                    "streaming_insert_chunk_size",
+                    th.IntegerType,
+                    default=500,
+                    description=(
+                        "The maximum number of rows sent in a single insertAll request by the"
+                        " streaming_insert method. Larger batches are split into jobs of this size"
+                        " which the worker pool inserts concurrently. Must be at least 1, values"
+                        " above BigQuery's limit of 50,000 rows per request are capped."
+                    ),
+                ),
                 th.Property(
                     "max_workers",
                     th.IntegerType,
@@ -487,10 +498,26 @@ class TargetBigQuery(Target):
             return self.add_sink(stream_name, schema, key_properties)
         return existing_sink
 
+    def wait_for_capacity(self, max_jobs_queued: int) -> None:
+        """Block until fewer than `max_jobs_queued` jobs are waiting in the global queue.
+
+        Job notifications are processed while waiting so the worker pool is resized rather
+        than waiting on workers which have terminated. Errors stop the wait but are left for
+        drain_one to raise since this is called mid-batch from within a sink."""
+        while self.queue.qsize() >= max_jobs_queued and not self.error_notification.poll():
+            self.job_notification.poll(1.0)
+            self.process_job_notifications()
+            self.resize_worker_pool()
+
     def drain_one(self, sink: Sink) -> None:  # type: ignore
         """Drain a sink. Includes a hook to manage the worker pool and notifications."""
         # self.logger.info(f"Jobs queued : {self.queue.qsize()} | Max nb jobs queued : {os.cpu_count() * 4} | Nb workers : {len(self.workers)} | Max nb workers : {os.cpu_count() * 2}")
         self.resize_worker_pool()
+        self.process_notifications()
+        super().drain_one(sink)
+
+    def process_job_notifications(self) -> None:
+        """Process job and log notifications sent by the workers."""
         while self.job_notification.poll():
             ext_id = self.job_notification.recv()
             self.worker_pings[ext_id] = time.time()
@@ -498,6 +525,10 @@ class TargetBigQuery(Target):
         while self.log_notification.poll():
             msg = self.log_notification.recv()
             self.logger.info(msg)
+
+    def process_notifications(self) -> None:
+        """Process job, log, and error notifications sent by the workers."""
+        self.process_job_notifications()
         if self.error_notification.poll():
             e, msg = self.error_notification.recv()
             if self.config.get("fail_fast", True):
@@ -515,7 +546,6 @@ class TargetBigQuery(Target):
                 raise RuntimeError(msg) from e
             else:
                 self.logger.warning(msg)
-        super().drain_one(sink)
 
     def drain_all(self, is_endofpipe: bool = False) -> None:  # type: ignore
         """Drain all sinks and write state message. If is_endofpipe, execute clean_up() on all sinks.
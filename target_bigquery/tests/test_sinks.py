@@ -0,0 +1,411 @@
+import mmap
+import threading
+import time
+from multiprocessing.dummy import Pipe
+from queue import Queue
+from tempfile import TemporaryFile
+from typing import Any, Dict, List, Type
+from unittest import mock
+
+import orjson
+import pytest
+from google.api_core.exceptions import Forbidden
+from google.auth.credentials import AnonymousCredentials
+from google.cloud import bigquery
+from google.cloud.bigquery import SchemaField
+from google.cloud.storage.retry import DEFAULT_RETRY
+
+from target_bigquery import gcs_stage, storage_write
+from target_bigquery.batch_job import (
+    BatchJobWorker,
+    BigQueryBatchJobDenormalizedSink,
+    BigQueryBatchJobSink,
+)
+from target_bigquery.batch_job import Job as BatchJob
+from target_bigquery.constants import SDC_FIELDS
+from target_bigquery.core import BaseBigQuerySink, BigQueryTable, IngestionStrategy
+from target_bigquery.gcs_stage import BigQueryGcsStagingSink
+from target_bigquery.proto_gen import proto_schema_factory_v2
+from target_bigquery.storage_write import BigQueryStorageWriteSink, framed_size
+from target_bigquery.streaming_insert import (
+    MAX_ROWS_PER_REQUEST,
+    MAX_ROWS_PER_REQUEST_LIMIT,
+    BigQueryStreamingInsertSink,
+    insert_rows,
+)
+from target_bigquery.target import TargetBigQuery
+
+RECORD = {
+    "id": 1,
+    "camelCase": {"nested": [1.5, None]},
+    "_sdc_extracted_at": "2023-01-01T00:00:00Z",
+    "_sdc_sequence": 1,
+}
+
+
+def drain(queue: Queue) -> list:
+    jobs = []
+    while not queue.empty():
+        jobs.append(queue.get_nowait())
+    return jobs
+
+
+@pytest.fixture
+def streaming_insert_sink() -> BigQueryStreamingInsertSink:
+    # Bypass __init__ which requires a live BigQuery client
+    sink = BigQueryStreamingInsertSink.__new__(BigQueryStreamingInsertSink)
+    sink._config = {}
+    sink.table = BigQueryTable(
+        name="table",
+        dataset="dataset",
+        project="project",
+        jsonschema={"properties": {}},
+        ingestion_strategy=IngestionStrategy.FIXED,
+    )
+    sink.global_queue = Queue()
+    sink.increment_jobs_enqueued = lambda: None
+    return sink
+
+
+@pytest.fixture
+def storage_write_sink() -> BigQueryStorageWriteSink:
+    # Bypass __init__ which requires a live BigQuery Storage client
+    sink = BigQueryStorageWriteSink.__new__(BigQueryStorageWriteSink)
+    sink._proto_schema = proto_schema_factory_v2([SchemaField("data", "STRING")])
+    sink.parent = "projects/project/datasets/dataset/tables/table"
+    sink.template = None
+    sink.template_bytes = 0
+    sink.stream_notifier = None
+    sink.global_queue = Queue()
+    sink.increment_jobs_enqueued = lambda: None
+    sink.wait_for_capacity = lambda max_jobs_queued: None
+    return sink
+
+
+@pytest.mark.parametrize(
+    "options,rows,expected",
+    [
+        ({}, MAX_ROWS_PER_REQUEST, [MAX_ROWS_PER_REQUEST]),
+        ({}, MAX_ROWS_PER_REQUEST + 1, [MAX_ROWS_PER_REQUEST, 1]),
+        ({}, MAX_ROWS_PER_REQUEST * 3, [MAX_ROWS_PER_REQUEST] * 3),
+        ({"streaming_insert_chunk_size": 100}, 250, [100, 100, 50]),
+    ],
+    ids=[
+        "exactly_one_request",
+        "one_row_over_one_request",
+        "multiple_full_requests",
+        "configured_chunk_size",
+    ],
+)
+def test_streaming_insert_batch_chunking(
+    streaming_insert_sink: BigQueryStreamingInsertSink,
+    options: dict,
+    rows: int,
+    expected: List[int],
+):
+    streaming_insert_sink._config = {"options": options}
+    records = [{"data": str(i)} for i in range(rows)]
+    streaming_insert_sink.records_to_drain = records
+    streaming_insert_sink.process_batch({})
+    jobs = drain(streaming_insert_sink.global_queue)
+    assert [len(job.records) for job in jobs] == expected
+    assert [record for job in jobs for record in job.records] == records
+    assert streaming_insert_sink.records_to_drain == []
+
+
+def write_rows(sink: BigQueryStorageWriteSink, rows: List[str]) -> List[List[bytes]]:
+    sink.start_batch({})
+    for row in rows:
+        sink.process_record({"data": row}, {})
+    sink.process_batch({})
+    return [list(job.data.serialized_rows) for job in drain(sink.global_queue)]
+
+
+def serialized_size(sink: BigQueryStorageWriteSink, row: str) -> int:
+    return framed_size(sink.proto_schema(data=row).SerializeToString())
+
+
+def test_storage_write_splits_batch_over_request_size(
+    storage_write_sink: BigQueryStorageWriteSink, monkeypatch
+):
+    rows = [str(i) * 30 for i in range(4)]
+    monkeypatch.setattr(
+        storage_write, "MAX_REQUEST_BYTES", serialized_size(storage_write_sink, rows[0]) * 3
+    )
+    jobs = write_rows(storage_write_sink, rows)
+    assert [len(job) for job in jobs] == [3, 1]
+    decode = storage_write_sink.proto_schema.FromString
+    assert [decode(row).data for job in jobs for row in job] == rows
+
+
+def test_storage_write_sends_oversized_row_alone(
+    storage_write_sink: BigQueryStorageWriteSink, monkeypatch
+):
+    rows = ["a" * 10, "b" * 200, "c" * 10]
+    monkeypatch.setattr(
+        storage_write, "MAX_REQUEST_BYTES", serialized_size(storage_write_sink, rows[1]) - 1
+    )
+    jobs = write_rows(storage_write_sink, rows)
+    assert [len(job) for job in jobs] == [1, 1, 1]
+    decode = storage_write_sink.proto_schema.FromString
+    assert [decode(row).data for job in jobs for row in job] == rows
+
+
+@pytest.mark.parametrize("chunk_size", [0, -100], ids=["zero", "negative"])
+def test_streaming_insert_rejects_invalid_chunk_size(
+    streaming_insert_sink: BigQueryStreamingInsertSink, chunk_size: int
+):
+    streaming_insert_sink._config = {"options": {"streaming_insert_chunk_size": chunk_size}}
+    records = [{"data": str(i)} for i in range(10)]
+    streaming_insert_sink.records_to_drain = records
+    with pytest.raises(ValueError, match="streaming_insert_chunk_size"):
+        streaming_insert_sink.process_batch({})
+    assert streaming_insert_sink.global_queue.empty()
+    assert streaming_insert_sink.records_to_drain == records
+
+
+def test_streaming_insert_clamps_chunk_size(streaming_insert_sink: BigQueryStreamingInsertSink):
+    streaming_insert_sink._config = {"options": {"streaming_insert_chunk_size": 10**6}}
+    assert streaming_insert_sink.rows_per_request == MAX_ROWS_PER_REQUEST_LIMIT
+
+
+def test_storage_write_counts_row_framing_and_template(
+    storage_write_sink: BigQueryStorageWriteSink, monkeypatch
+):
+    storage_write_sink.template_bytes = 5
+    rows = ["a"] * 10
+    payload = storage_write_sink.proto_schema(data="a").SerializeToString()
+    # The payloads alone would fit in a single request
+    monkeypatch.setattr(storage_write, "MAX_REQUEST_BYTES", len(payload) * len(rows))
+    jobs = write_rows(storage_write_sink, rows)
+    assert len(jobs) > 1
+    for job in jobs:
+        request = storage_write.types.ProtoRows(serialized_rows=job)
+        request_bytes = storage_write.types.ProtoRows.pb(request).ByteSize()
+        assert storage_write_sink.template_bytes + request_bytes <= storage_write.MAX_REQUEST_BYTES
+
+
+@pytest.mark.parametrize(
+    "sink_cls,serialized",
+    [
+        (BigQueryBatchJobSink, False),
+        (BigQueryGcsStagingSink, False),
+        (BigQueryStorageWriteSink, True),
+        (BigQueryStreamingInsertSink, True),
+    ],
+    ids=["batch_job", "gcs_stage", "storage_write", "streaming_insert"],
+)
+def test_fixed_schema_preprocess_record(sink_cls: Type[BaseBigQuerySink], serialized: bool):
+    sink = sink_cls.__new__(sink_cls)
+    data = {k: v for k, v in RECORD.items() if k not in SDC_FIELDS}
+    expected = {
+        "data": orjson.dumps(data).decode("utf-8") if serialized else data,
+        **{k: RECORD.get(k) for k in SDC_FIELDS},
+    }
+    assert sink.preprocess_record(dict(RECORD), {}) == expected
+
+
+@pytest.mark.parametrize(
+    "transforms,expected",
+    [
+        ({}, RECORD),
+        (
+            {"snake_case": True},
+            {
+                "id": 1,
+                "camel_case": {"nested": [1.5, None]},
+                "_sdc_extracted_at": "2023-01-01T00:00:00Z",
+                "_sdc_sequence": 1,
+            },
+        ),
+    ],
+    ids=["no_transforms", "snake_case"],
+)
+def test_denormalized_preprocess_record(transforms: Dict[str, bool], expected: Dict[str, Any]):
+    def init(self, *args, **kwargs) -> None:
+        # Bypass the base __init__ which requires a live BigQuery client
+        self.table = BigQueryTable(
+            name="table",
+            dataset="dataset",
+            project="project",
+            jsonschema={"properties": {"id": {"type": "integer"}}},
+            transforms=transforms,
+            ingestion_strategy=IngestionStrategy.DENORMALIZED,
+        )
+
+    with mock.patch.object(BaseBigQuerySink, "__init__", init):
+        sink = BigQueryBatchJobDenormalizedSink()
+    record = dict(RECORD)
+    if not transforms:
+        # Records pass through as is rather than being copied
+        assert sink.preprocess_record(record, {}) is record
+    assert sink.preprocess_record(record, {}) == expected
+
+
+def test_insert_rows_uses_default_retry():
+    client = mock.MagicMock()
+    client._call_api.return_value = {"insertErrors": [{"index": 1, "errors": []}]}
+    table = bigquery.TableReference.from_string("project.dataset.table")
+    errors = insert_rows(client, table, [{"data": "{}"}, {"data": "[]"}])
+    assert errors == [{"index": 1, "errors": []}]
+    (retry,), kwargs = client._call_api.call_args
+    assert retry is bigquery.DEFAULT_RETRY
+    assert kwargs["method"] == "POST"
+    assert kwargs["path"] == "/projects/project/datasets/dataset/tables/table/insertAll"
+    assert kwargs["content_type"] == "application/json"
+    payload = orjson.loads(kwargs["data"])
+    assert [row["json"] for row in payload["rows"]] == [{"data": "{}"}, {"data": "[]"}]
+    assert len({row["insertId"] for row in payload["rows"]}) == 2
+
+
+def test_wait_for_capacity_wakes_on_job_notification():
+    # Bypass __init__ which requires a valid config
+    target = TargetBigQuery.__new__(TargetBigQuery)
+    target.queue = Queue()
+    target.job_notification, job_notifier = Pipe(False)
+    target.error_notification, _ = Pipe(False)
+    notifications_processed = []
+    target.resize_worker_pool = lambda: None
+    target.process_job_notifications = lambda: notifications_processed.append(
+        target.job_notification.recv()
+    )
+    target.queue.put(1)
+    target.queue.put(2)
+
+    def worker():
+        time.sleep(0.2)
+        target.queue.get()
+        job_notifier.send(True)
+
+    thread = threading.Thread(target=worker)
+    thread.start()
+    target.wait_for_capacity(2)
+    thread.join()
+    assert target.queue.qsize() == 1
+    assert notifications_processed == [True]
+
+
+def test_wait_for_capacity_leaves_errors_to_drain_one():
+    # Bypass __init__ which requires a valid config
+    target = TargetBigQuery.__new__(TargetBigQuery)
+    target.queue = Queue()
+    target.job_notification, _ = Pipe(False)
+    target.error_notification, error_notifier = Pipe(False)
+    target.resize_worker_pool = lambda: None
+    target.process_job_notifications = lambda: None
+    target.drain_all = mock.MagicMock()
+    target.queue.put(1)
+    error_notifier.send((RuntimeError("boom"), "Worker failed"))
+    target.wait_for_capacity(1)
+    target.drain_all.assert_not_called()
+    assert target.error_notification.poll()
+
+
+class FakeBucket:
+    def __init__(self) -> None:
+        self.blobs: dict = {}
+        self.uploading = 0
+        self.max_uploading = 0
+        self.lock = threading.Lock()
+
+    def blob(self, name: str) -> "FakeBlob":
+        self.blobs[name] = FakeBlob(self, name)
+        return self.blobs[name]
+
+
+class FakeBlob:
+    def __init__(self, bucket: FakeBucket, name: str) -> None:
+        self.bucket = bucket
+        self.name = name
+        self.data = b""
+        self.retry = None
+        self.composed: List[str] = []
+
+    def upload_from_string(self, data: bytes, **kwargs) -> None:
+        with self.bucket.lock:
+            self.bucket.uploading += 1
+            self.bucket.max_uploading = max(self.bucket.max_uploading, self.bucket.uploading)
+        time.sleep(0.05)
+        self.data = data
+        self.retry = kwargs.get("retry")
+        with self.bucket.lock:
+            self.bucket.uploading -= 1
+
+    def compose(self, sources: List["FakeBlob"], **kwargs) -> None:
+        self.composed = [source.name for source in sources]
+        self.data = b"".join(source.data for source in sources)
+
+    def delete(self) -> None:
+        raise Forbidden("storage.objects.delete denied")
+
+
+def test_upload_composite_bounds_parts_and_tolerates_failed_cleanup(monkeypatch):
+    monkeypatch.setattr(gcs_stage, "COMPOSITE_PART_SIZE", 4)
+    bucket = FakeBucket()
+    blob = bucket.blob("staging.jsonl.gz")
+    buffer = bytes(range(100))
+    gcs_stage.upload_composite(blob, buffer)
+    assert blob.data == buffer
+    assert len(blob.composed) == 25
+    assert all(bucket.blobs[name].retry is DEFAULT_RETRY for name in blob.composed)
+    assert bucket.max_uploading <= gcs_stage.MAX_COMPOSITE_PARTS_IN_FLIGHT
+
+
+def test_upload_composite_waits_for_parts_before_cleanup(monkeypatch):
+    monkeypatch.setattr(gcs_stage, "COMPOSITE_PART_SIZE", 4)
+    bucket = FakeBucket()
+    blob = bucket.blob("staging.jsonl.gz")
+    deleted_while_uploading = []
+    upload = FakeBlob.upload_from_string
+
+    def upload_from_string(self, data: bytes, **kwargs) -> None:
+        if self.name.endswith("part00"):
+            raise Forbidden("storage.objects.create denied")
+        upload(self, data, **kwargs)
+
+    def delete(self) -> None:
+        deleted_while_uploading.append(bucket.uploading)
+
+    monkeypatch.setattr(FakeBlob, "upload_from_string", upload_from_string)
+    monkeypatch.setattr(FakeBlob, "delete", delete)
+    with pytest.raises(Forbidden):
+        gcs_stage.upload_composite(blob, bytes(range(32)))
+    assert deleted_while_uploading == [0] * 8
+
+
+def test_batch_job_worker_rewinds_mmap_on_retry():
+    payload = b'{"a":1}\n' * 100
+    client = bigquery.Client(project="project", credentials=AnonymousCredentials())
+    queue = Queue()
+    uploads, reads = [], []
+
+    def upload(file_obj, *args, **kwargs):
+        uploads.append(file_obj)
+        if len(uploads) == 1:
+            # Fail part way through the upload, leaving the mmap position advanced
+            file_obj.read(10)
+            raise ConnectionError("connection reset")
+        reads.append(file_obj.read())
+        queue.put(None)
+        return mock.MagicMock()
+
+    client._do_resumable_upload = upload
+    client.job_from_resource = lambda resource: mock.MagicMock()
+    job_notification, job_notifier = Pipe(False)
+    _, error_notifier = Pipe(False)
+    _, log_notifier = Pipe(False)
+    worker = BatchJobWorker("worker", queue, None, job_notifier, error_notifier, log_notifier)
+    with TemporaryFile() as fh:
+        fh.write(payload)
+        fh.flush()
+        data = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        job = BatchJob(data=data, table="project.dataset.table", config={})
+        queue.put(job)
+        with mock.patch("target_bigquery.batch_job.bigquery_client_factory", return_value=client):
+            worker.run()
+        # The mmap is handed to the client as is and read from the start on the retry
+        assert uploads == [data, data]
+        assert reads == [payload]
+        assert job.attempt == 2
+        assert job_notification.recv() is True
+        data.close()
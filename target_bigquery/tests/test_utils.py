@@ -1,11 +1,16 @@
+import gzip
+from decimal import Decimal
 from typing import List
 
+import orjson
 import pytest
 import singer_sdk.typing as th
 from google.cloud.bigquery import SchemaField
 
 from target_bigquery.core import (
+    MAX_ROWS_PER_WRITE,
     BigQueryTable,
+    Compressor,
     IngestionStrategy,
     SchemaTranslator,
     bigquery_type,
@@ -676,12 +681,61 @@ def test_schema_translator_tables(schema: dict, transforms: dict, expected: List
                 },
             ],
         ),
+        (
+            {"type": "object", "properties": {"IntColumn": {"type": "integer"}}},
+            {"snake_case": True},
+            [
+                {"IntColumn": 1, "UnknownColumn": 2},
+                {"UnknownColumn": {"NestedUnknown": 3}},
+            ],
+            [
+                {"int_column": 1, "unknown_column": 2},
+                {"unknown_column": {"nested_unknown": 3}},
+            ],
+        ),
+        (
+            {"type": "object", "properties": {}},
+            {"snake_case": True},
+            [
+                {
+                    "ArrayColumn": [
+                        {"IntColumn": 1, "ListColumn": [{"InnerColumn": 2}]},
+                        "NotARecord",
+                        None,
+                    ]
+                }
+            ],
+            [
+                {
+                    "array_column": [
+                        {"int_column": 1, "list_column": [{"inner_column": 2}]},
+                        "NotARecord",
+                        None,
+                    ]
+                }
+            ],
+        ),
+        (
+            {
+                "type": "object",
+                "properties": {
+                    "FooBar": {"type": "integer"},
+                    "foo_bar": {"type": "integer"},
+                },
+            },
+            {"snake_case": True},
+            [{"FooBar": 1, "foo_bar": 2}, {"foo_bar": 2, "FooBar": 1}],
+            [{"foo_bar": 2}, {"foo_bar": 1}],
+        ),
     ],
     ids=[
         "record_translation_noop",
         "record_translation_with_transform",
         "record_translation_nested_with_transform",
         "record_translation_nested_list_with_transform",
+        "record_translation_keys_outside_schema",
+        "record_translation_nested_lists_outside_schema",
+        "record_translation_snake_case_collision_last_wins",
     ],
 )
 def test_schema_translator_records(
@@ -696,6 +750,34 @@ def test_schema_translator_records(
     ] == expected
 
 
+def test_bigquery_table_schema_preserves_property_order():
+    opts = {
+        "dataset": "dataset",
+        "project": "project",
+        "ingestion_strategy": IngestionStrategy.DENORMALIZED,
+    }
+    schema = {
+        "type": "object",
+        "properties": {
+            "zeta": {"type": "number", "multipleOf": Decimal("0.01")},
+            "alpha": {"type": "integer", "minimum": Decimal("1.5")},
+            "mid": {
+                "type": "object",
+                "properties": {"b": {"type": "string"}, "a": {"type": "string"}},
+            },
+        },
+    }
+    reordered = {"type": "object", "properties": dict(reversed(schema["properties"].items()))}
+    table = BigQueryTable(name="a", jsonschema=schema, **opts)
+    assert [f.name for f in table.get_schema()] == ["zeta", "alpha", "mid"]
+    assert [f.name for f in table.get_schema()[2].fields] == ["b", "a"]
+    # Tables sharing a schema share a translator, a different property order does not
+    assert BigQueryTable(name="b", jsonschema=schema, **opts).get_schema() is table.get_schema()
+    assert [
+        f.name for f in BigQueryTable(name="c", jsonschema=reordered, **opts).get_schema()
+    ] == ["mid", "alpha", "zeta"]
+
+
 def test_jit_compile_proto():
     jit = proto_schema_factory_v2(
         [
@@ -727,3 +809,26 @@ def test_jit_compile_proto():
         == b"\x08\x01\x12\x04test\x19\x00\x00\x00\x00\x00\x00\xf0?"
         b" \x01*\n2020-01-012\n2020-01-01:\x0800:00:00"
     )
+
+
+def test_compressor_write_records():
+    compressor = Compressor()
+    compressor.write_records([{"a": 1}, {"b": [1, 2]}])
+    compressor.write_records([])
+    compressor.write_records([{"c": None}])
+    assert gzip.decompress(compressor.getvalue()) == b'{"a":1}\n{"b":[1,2]}\n{"c":null}\n'
+
+
+def test_compressor_write_record():
+    compressor = Compressor()
+    records = [{"i": i} for i in range(MAX_ROWS_PER_WRITE + 1)]
+    for record in records[:MAX_ROWS_PER_WRITE]:
+        compressor.write_record(record)
+    # A full slice is written through, leaving nothing buffered
+    assert compressor._records == []
+    compressor.write_record(records[-1])
+    assert compressor._records == [records[-1]]
+    # Closing writes the remainder
+    assert gzip.decompress(compressor.getvalue()) == b"".join(
+        orjson.dumps(record, option=orjson.OPT_APPEND_NEWLINE) for record in records
+    )